@@ -4,22 +4,82 @@ Main application entry point
 Version: 1.0.0
 """
 
-from flask import Flask
+from flask import Flask, current_app, g, url_for
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from flask_caching import Cache
+from jinja2 import FileSystemBytecodeCache
+from argon2 import PasswordHasher
+from sqlalchemy import event
+import orjson
 import os
+from datetime import datetime, timezone
 
 from config import Config
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
+cache = Cache()
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson; dates and datetimes serialize as ISO 8601"""
+
+    def _dumps_bytes(self, obj, indent=False, option=0):
+        # Stored timestamps are UTC; SQLite returns them naive
+        option |= orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, kwargs.get('indent')).decode()
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of via str
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent, orjson.OPT_APPEND_NEWLINE),
+            mimetype=self.mimetype
+        )
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            # Hooks such as the session serializer's object_hook need stdlib json
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def _sqlite_pragma_listener(journal_mode, synchronous):
+    """Build a connect listener applying the configured SQLite journal and sync modes"""
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        cursor.execute(f'PRAGMA synchronous={synchronous}')
+        cursor.close()
+    return set_sqlite_pragmas
+
+
+def static_url(endpoint):
+    """Path of a parameterless endpoint, resolved once by create_app"""
+    return current_app.extensions['urls'][endpoint]
 
 
 def create_app(config_class=Config):
     """Application factory pattern for creating Flask app instance"""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
+    # Keep compiled templates in memory; auto-reload follows TEMPLATES_AUTO_RELOAD.
+    # Jinja reads cache_size only when the environment is built, so this must
+    # run before anything (Flask-Caching included) touches app.jinja_env
+    app.jinja_options = {
+        **app.jinja_options,
+        'cache_size': app.config.get('TEMPLATE_CACHE_SIZE', 400)
+    }
 
     # Initialize Flask extensions
     db.init_app(app)
@@ -27,6 +87,27 @@ def create_app(config_class=Config):
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
+    cache.init_app(app)
+
+    # Argon2id hasher shared by every login/registration; explicit parameters
+    # keep auth latency stable across library upgrades
+    app.extensions['password_hasher'] = PasswordHasher(
+        time_cost=app.config['PASSWORD_HASH_TIME_COST'],
+        memory_cost=app.config['PASSWORD_HASH_MEMORY_COST'],
+        parallelism=app.config['PASSWORD_HASH_PARALLELISM']
+    )
+
+    bytecode_cache_dir = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    # Workout categories are fixed per app, so templates read them as a global
+    app.jinja_env.globals['CATEGORIES'] = tuple(app.config['WORKOUT_CATEGORIES'])
+
+    # Resolve the current UTC date once per request for date defaults and ranges
+    @app.before_request
+    def set_today():
+        g.today = datetime.now(timezone.utc).date()
 
     # Register blueprints
     from routes.auth import auth_bp
@@ -39,9 +120,29 @@ def create_app(config_class=Config):
     app.register_blueprint(workouts_bp, url_prefix='/workouts')
     app.register_blueprint(analytics_bp, url_prefix='/analytics')
 
-    # Create database tables
+    # Paths of redirect targets without URL parameters, resolved once per app
+    with app.test_request_context():
+        app.extensions['urls'] = {
+            endpoint: url_for(endpoint)
+            for endpoint in ('auth.login', 'auth.profile', 'main.index',
+                             'main.dashboard', 'workouts.list_workouts')
+        }
+
     with app.app_context():
-        db.create_all()
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', _sqlite_pragma_listener(
+                app.config['SQLITE_JOURNAL_MODE'], app.config['SQLITE_SYNCHRONOUS']
+            ))
+
+    if app.config.get('PRELOAD_TEMPLATES'):
+        for template_name in app.jinja_env.list_templates(extensions=['html']):
+            app.jinja_env.get_template(template_name)
+
+    # Create database tables (skipped when the schema is provisioned separately,
+    # e.g. with `python run.py init-db`)
+    if app.config.get('AUTO_CREATE_TABLES', True):
+        with app.app_context():
+            db.create_all()
 
     return app
 
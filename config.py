@@ -4,6 +4,7 @@ Configuration settings for ACEest Fitness application
 
 import os
 from datetime import timedelta
+from sqlalchemy.pool import NullPool, StaticPool
 
 
 class Config:
@@ -27,9 +28,48 @@ class Config:
         'pool_recycle': 300,    # Recycle connections after 5 minutes
     }
     
+    # Create missing tables when the app starts; every Gunicorn worker pays this
+    # metadata round trip, so disable it once the schema is provisioned
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'true').lower() == 'true'
+    
+    # Connection pool sizing per worker process (not applicable to SQLite)
+    if not database_url.startswith('sqlite'):
+        if os.environ.get('DB_DISABLE_POOL', '').lower() in ('1', 'true', 'yes'):
+            # Let an external pooler such as PgBouncer manage connections
+            SQLALCHEMY_ENGINE_OPTIONS['poolclass'] = NullPool
+        else:
+            SQLALCHEMY_ENGINE_OPTIONS.update({
+                'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+                'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+                'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            })
+    
+    # SQLite write durability: WAL makes a commit one log append instead of a full sync
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    
+    # Argon2id password hashing cost (tuned for roughly 50 ms per hash)
+    PASSWORD_HASH_TIME_COST = 2
+    PASSWORD_HASH_MEMORY_COST = 64 * 1024  # KiB
+    PASSWORD_HASH_PARALLELISM = 2
+    
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     
+    # Cache configuration
+    # Cached data must be shared by all workers, so only Redis is used by default
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or ('RedisCache' if CACHE_REDIS_URL else 'NullCache')
+    CACHE_DEFAULT_TIMEOUT = 300
+    
+    # Number of compiled Jinja templates kept in memory
+    TEMPLATE_CACHE_SIZE = 400
+    # Directory for compiled template bytecode, shared by workers across restarts
+    TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    # Compile every template in create_app instead of on each worker's first requests;
+    # read from the environment because Gunicorn loads run:app with this base config
+    PRELOAD_TEMPLATES = os.environ.get('PRELOAD_TEMPLATES', 'false').lower() == 'true'
+    
     # Pagination
     WORKOUTS_PER_PAGE = 20
     
@@ -47,17 +87,39 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'SimpleCache'
 
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False
+    PRELOAD_TEMPLATES = os.environ.get('PRELOAD_TEMPLATES', 'true').lower() == 'true'
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'false').lower() == 'true'
 
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///test_aceest_fitness.db'
+    SECRET_KEY = 'test-secret-key'
+    # Skip CSRF token generation and checks on test form posts
+    WTF_CSRF_ENABLED = False
+    WTF_CSRF_CHECK_DEFAULT = False
+    # Minimal hashing cost keeps fixture setup fast
+    PASSWORD_HASH_TIME_COST = 1
+    PASSWORD_HASH_MEMORY_COST = 8
+    PASSWORD_HASH_PARALLELISM = 1
+    # One in-memory database shared by every connection; the test fixtures
+    # create the schema once per session
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+    AUTO_CREATE_TABLES = False
+    # Throwaway database: no rollback journal on disk and no syncs
+    SQLITE_JOURNAL_MODE = 'MEMORY'
+    SQLITE_SYNCHRONOUS = 'OFF'
 
 
 # Configuration dictionary
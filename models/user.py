@@ -2,16 +2,76 @@
 User model for authentication and profile management
 """
 
-from datetime import datetime
+from bisect import bisect_right
+from datetime import datetime, timezone
+from functools import cached_property
+from flask import current_app
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-from app import db, login_manager
+from sqlalchemy import event
+from sqlalchemy.orm import load_only
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
+from app import db, login_manager, cache
+from models.workout import Workout
+
+
+# BMI category boundaries; each label covers values below the next threshold
+_BMI_THRESHOLDS = (16, 18.5, 25, 30, 35, 40)
+_BMI_LABELS = (
+    "Severely Underweight",
+    "Underweight",
+    "Normal weight",
+    "Overweight",
+    "Obese Class I",
+    "Obese Class II",
+    "Obese Class III"
+)
+
+# Health recommendation for each BMI category
+_HEALTH_RECOMMENDATIONS = {
+    "Severely Underweight": "Consult a healthcare provider immediately for nutritional guidance.",
+    "Underweight": "Consider increasing calorie intake and strength training.",
+    "Normal weight": "Maintain current weight with balanced diet and regular exercise.",
+    "Overweight": "Focus on cardio exercises and calorie deficit diet.",
+    "Obese Class I": "Consult a fitness trainer for personalized weight loss plan.",
+    "Obese Class II": "Medical supervision recommended for weight management.",
+    "Obese Class III": "Immediate medical consultation required for health assessment."
+}
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user by ID for Flask-Login"""
-    return User.query.get(int(user_id))
+    """
+    Load user by ID for Flask-Login
+    Only the columns rendered on regular pages are loaded; credentials,
+    email and timestamps are fetched on first access when a view needs them
+    """
+    return db.session.get(User, int(user_id), options=[load_only(
+        User.id, User.username, User.full_name, User.age,
+        User.gender, User.height_cm, User.weight_kg
+    )])
+
+
+def _password_hasher():
+    """Return the application's Argon2 hasher (created once in create_app)"""
+    return current_app.extensions['password_hasher']
+
+
+@cache.memoize()
+def workout_stats(user_id):
+    """Aggregate a user's workout statistics (cached until their workouts change)"""
+    row = Workout.totals_for_user(user_id)
+    return {
+        'total_workouts': row.count,
+        'total_duration': row.duration,
+        'total_calories': row.calories,
+        'average_duration': round(row.duration / row.count, 1) if row.count > 0 else 0
+    }
+
+
+def invalidate_workout_stats(user_id):
+    """Drop cached workout statistics after a user's workouts change"""
+    cache.delete_memoized(workout_stats, user_id)
 
 
 class User(UserMixin, db.Model):
@@ -39,24 +99,37 @@ class User(UserMixin, db.Model):
     # BMI and BMR will be calculated on-the-fly
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc), nullable=False)
     
     # Relationships
-    workouts = db.relationship('Workout', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    workouts = db.relationship('Workout', backref='user', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<User {self.username}>'
     
     def set_password(self, password):
         """Hash and set user password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = _password_hasher().hash(password)
     
     def check_password(self, password):
-        """Verify user password"""
-        return check_password_hash(self.password_hash, password)
-    
-    @property
+        """Verify user password (accepts legacy Werkzeug PBKDF2 hashes)"""
+        if not self.password_hash.startswith('$argon2'):
+            return check_password_hash(self.password_hash, password)
+        
+        try:
+            return _password_hasher().verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash uses a legacy scheme or outdated parameters"""
+        if not self.password_hash.startswith('$argon2'):
+            return True
+        return _password_hasher().check_needs_rehash(self.password_hash)
+    
+    @cached_property
     def bmi(self):
         """Calculate Body Mass Index (BMI)"""
         if self.height_cm and self.weight_kg and self.height_cm > 0:
@@ -64,7 +137,7 @@ class User(UserMixin, db.Model):
             return round(self.weight_kg / (height_m ** 2), 2)
         return None
     
-    @property
+    @cached_property
     def bmi_category(self):
         """
         Determine BMI category with enhanced classification
@@ -73,61 +146,37 @@ class User(UserMixin, db.Model):
         if not self.bmi:
             return "Unknown"
         
-        # Enhanced BMI categories
-        if self.bmi < 16:
-            return "Severely Underweight"
-        elif 16 <= self.bmi < 18.5:
-            return "Underweight"
-        elif 18.5 <= self.bmi < 25:
-            return "Normal weight"
-        elif 25 <= self.bmi < 30:
-            return "Overweight"
-        elif 30 <= self.bmi < 35:
-            return "Obese Class I"
-        elif 35 <= self.bmi < 40:
-            return "Obese Class II"
-        else:
-            return "Obese Class III"
+        return _BMI_LABELS[bisect_right(_BMI_THRESHOLDS, self.bmi)]
     
-    @property
+    @cached_property
     def health_recommendation(self):
         """Provide health recommendation based on BMI category"""
         if not self.bmi:
             return "Please update your profile with height and weight information."
         
-        recommendations = {
-            "Severely Underweight": "Consult a healthcare provider immediately for nutritional guidance.",
-            "Underweight": "Consider increasing calorie intake and strength training.",
-            "Normal weight": "Maintain current weight with balanced diet and regular exercise.",
-            "Overweight": "Focus on cardio exercises and calorie deficit diet.",
-            "Obese Class I": "Consult a fitness trainer for personalized weight loss plan.",
-            "Obese Class II": "Medical supervision recommended for weight management.",
-            "Obese Class III": "Immediate medical consultation required for health assessment."
-        }
-        
-        return recommendations.get(self.bmi_category, "Consult a healthcare provider.")
+        return _HEALTH_RECOMMENDATIONS.get(self.bmi_category, "Consult a healthcare provider.")
     
-    @property
+    @cached_property
     def bmr(self):
         """
         Calculate Basal Metabolic Rate (BMR) using Mifflin-St Jeor Equation
         BMR (Men) = 10 × weight(kg) + 6.25 × height(cm) - 5 × age(years) + 5
         BMR (Women) = 10 × weight(kg) + 6.25 × height(cm) - 5 × age(years) - 161
         """
-        if not all([self.weight_kg, self.height_cm, self.age, self.gender]):
+        if not (self.weight_kg and self.height_cm and self.age and self.gender):
             return None
         
         base_bmr = (10 * self.weight_kg) + (6.25 * self.height_cm) - (5 * self.age)
         
         if self.gender.upper() == 'M':
-            return round(base_bmr + 5, 0)
+            return base_bmr + 5
         elif self.gender.upper() == 'F':
-            return round(base_bmr - 161, 0)
+            return base_bmr - 161
         else:
             # For other genders, use average
-            return round(base_bmr - 78, 0)
+            return base_bmr - 78
     
-    @property
+    @cached_property
     def tdee(self):
         """
         Calculate Total Daily Energy Expenditure (TDEE)
@@ -135,17 +184,24 @@ class User(UserMixin, db.Model):
         """
         if not self.bmr:
             return None
-        return round(self.bmr * 1.55, 0)
+        return self.bmr * 1.55
     
     def get_workout_stats(self):
         """Get user's workout statistics"""
-        total_workouts = self.workouts.count()
-        total_duration = sum(workout.duration for workout in self.workouts)
-        total_calories = sum(workout.calories_burned for workout in self.workouts if workout.calories_burned)
-        
-        return {
-            'total_workouts': total_workouts,
-            'total_duration': total_duration,
-            'total_calories': total_calories,
-            'average_duration': round(total_duration / total_workouts, 1) if total_workouts > 0 else 0
-        }
+        return workout_stats(self.id)
+
+
+# Health metrics derived from profile fields, cached per instance
+_HEALTH_METRICS = ('bmi', 'bmi_category', 'health_recommendation', 'bmr', 'tdee')
+
+
+def _clear_health_metrics(target, *args):
+    """Drop cached health metrics so they are recomputed on next access"""
+    for name in _HEALTH_METRICS:
+        target.__dict__.pop(name, None)
+
+
+for _attribute in (User.height_cm, User.weight_kg, User.age, User.gender):
+    event.listen(_attribute, 'set', _clear_health_metrics)
+event.listen(User, 'expire', _clear_health_metrics)
+event.listen(User, 'refresh', _clear_health_metrics)
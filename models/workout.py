@@ -3,6 +3,7 @@ Workout model for tracking exercise sessions
 """
 
 from datetime import datetime, timezone
+from sqlalchemy import func
 from app import db
 
 
@@ -10,12 +11,19 @@ class Workout(db.Model):
     """Workout model for storing individual exercise sessions"""
     
     __tablename__ = 'workouts'
+    __table_args__ = (
+        # Analytics filter by user and date range, or group by category per user.
+        # The list view orders by (workout_date, created_at) DESC, served by a
+        # backward scan of the same index without a separate sort step.
+        db.Index('ix_workout_user_date_created', 'user_id', 'workout_date', 'created_at'),
+        db.Index('ix_workout_user_category', 'user_id', 'category'),
+    )
     
     # Primary key
     id = db.Column(db.Integer, primary_key=True)
     
     # Foreign key to User
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Workout details
     category = db.Column(db.String(50), nullable=False, index=True)  # Warm-up, Workout, Cool-down
@@ -28,46 +36,75 @@ class Workout(db.Model):
     intensity = db.Column(db.String(20), nullable=True)  # Low, Medium, High
     
     # Timestamps
-    workout_date = db.Column(db.Date, nullable=False, index=True)
-    created_at = db.Column(db.DateTime, nullable=False)
-    updated_at = db.Column(db.DateTime, nullable=False)
-    
-    def __init__(self, **kwargs):
-        """Initialize workout with default timestamps if not provided"""
-        if 'workout_date' not in kwargs:
-            kwargs['workout_date'] = datetime.now(timezone.utc).date()
-        if 'created_at' not in kwargs:
-            kwargs['created_at'] = datetime.now(timezone.utc)
-        if 'updated_at' not in kwargs:
-            kwargs['updated_at'] = datetime.now(timezone.utc)
-        super().__init__(**kwargs)
+    workout_date = db.Column(db.Date, nullable=False, default=lambda: datetime.now(timezone.utc).date())
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
     
     def __repr__(self):
         return f'<Workout {self.exercise_name} - {self.duration}min>'
     
+    @staticmethod
+    def calories_for(duration, weight_kg, met_value):
+        """
+        Calories burned using MET formula
+        Calories = (MET × 3.5 × weight_kg / 200) × duration_minutes
+        
+        Returns None when any input is missing
+        """
+        if weight_kg and met_value and duration:
+            return (met_value * 3.5 * weight_kg / 200) * duration
+        return None
+    
     def calculate_calories(self, weight_kg, met_value):
         """
         Calculate calories burned using MET formula
-        Calories = (MET × 3.5 × weight_kg / 200) × duration_minutes
         
         Args:
             weight_kg: User's weight in kilograms
             met_value: Metabolic Equivalent of Task value
         """
-        if weight_kg and met_value and self.duration:
-            self.calories_burned = round((met_value * 3.5 * weight_kg / 200) * self.duration, 2)
+        calories = self.calories_for(self.duration, weight_kg, met_value)
+        if calories is not None:
+            self.calories_burned = calories
         return self.calories_burned
     
+    @classmethod
+    def totals_for_user(cls, user_id, start_date=None, end_date=None):
+        """
+        Aggregate a user's workouts in a single query
+        
+        Args:
+            user_id: ID of the user owning the workouts
+            start_date: Optional first workout date to include
+            end_date: Optional last workout date to include
+        
+        Returns:
+            Row with count, duration and calories attributes
+        """
+        query = db.session.query(
+            func.count(cls.id).label('count'),
+            func.coalesce(func.sum(cls.duration), 0).label('duration'),
+            func.coalesce(func.sum(cls.calories_burned), 0).label('calories')
+        ).filter(cls.user_id == user_id)
+        
+        if start_date:
+            query = query.filter(cls.workout_date >= start_date)
+        if end_date:
+            query = query.filter(cls.workout_date <= end_date)
+        
+        return query.one()
+    
     def to_dict(self):
-        """Convert workout to dictionary for JSON serialization"""
+        """Convert workout to dictionary for JSON serialization via app.json"""
         return {
             'id': self.id,
             'category': self.category,
             'exercise_name': self.exercise_name,
             'duration': self.duration,
-            'calories_burned': self.calories_burned,
+            'calories_burned': round(self.calories_burned, 2) if self.calories_burned is not None else None,
             'notes': self.notes,
             'intensity': self.intensity,
-            'workout_date': self.workout_date.isoformat() if self.workout_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'workout_date': self.workout_date,
+            'created_at': self.created_at
         }
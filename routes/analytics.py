@@ -3,10 +3,10 @@ Analytics routes blueprint
 Handles progress tracking, charts, and statistics
 """
 
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, render_template, jsonify, g
 from flask_login import login_required, current_user
-from datetime import datetime, timedelta
-from sqlalchemy import func
+from datetime import timedelta
+from sqlalchemy import case, func, select
 from app import db
 from models.workout import Workout
 from config import Config
@@ -18,9 +18,6 @@ analytics_bp = Blueprint('analytics', __name__)
 @login_required
 def progress():
     """Display progress tracking dashboard"""
-    # Get overall statistics
-    stats = current_user.get_workout_stats()
-    
     # Get category breakdown
     category_stats = db.session.query(
         Workout.category,
@@ -41,11 +38,20 @@ def progress():
         for stat in category_stats
     }
     
+    # Overall statistics are the sum of the per-category rows
+    total_workouts = sum(stat.count for stat in category_stats)
+    total_duration = sum(stat.total_duration or 0 for stat in category_stats)
+    stats = {
+        'total_workouts': total_workouts,
+        'total_duration': total_duration,
+        'total_calories': sum(stat.total_calories or 0 for stat in category_stats),
+        'average_duration': round(total_duration / total_workouts, 1) if total_workouts > 0 else 0
+    }
+    
     return render_template(
         'analytics/progress.html',
         stats=stats,
-        category_data=category_data,
-        categories=Config.WORKOUT_CATEGORIES
+        category_data=category_data
     )
 
 
@@ -54,45 +60,50 @@ def progress():
 def chart_data():
     """API endpoint for chart data"""
     # Get last 30 days of workout data
-    end_date = datetime.utcnow().date()
+    end_date = g.today
     start_date = end_date - timedelta(days=30)
     
-    # Query workouts grouped by date and category
-    workout_data = db.session.query(
-        Workout.workout_date,
-        Workout.category,
-        func.sum(Workout.duration).label('total_duration'),
-        func.sum(Workout.calories_burned).label('total_calories')
-    ).filter(
-        Workout.user_id == current_user.id,
-        Workout.workout_date >= start_date,
-        Workout.workout_date <= end_date
-    ).group_by(
-        Workout.workout_date,
-        Workout.category
-    ).order_by(Workout.workout_date).all()
+    # Pivot each category into its own duration/calories columns, one row per date
+    category_columns = []
+    for category in Config.WORKOUT_CATEGORIES:
+        category_columns.append(func.sum(
+            case((Workout.category == category, Workout.duration), else_=0)
+        ).label(f'{category}_duration'))
+        category_columns.append(func.sum(
+            case((Workout.category == category, Workout.calories_burned), else_=0)
+        ).label(f'{category}_calories'))
+    
+    # Plain column rows streamed in batches; no ORM entities are built
+    workout_data = db.session.execute(
+        select(
+            Workout.workout_date,
+            func.sum(Workout.duration).label('total_duration'),
+            func.sum(Workout.calories_burned).label('total_calories'),
+            *category_columns
+        ).where(
+            Workout.user_id == current_user.id,
+            Workout.workout_date >= start_date,
+            Workout.workout_date <= end_date
+        ).group_by(Workout.workout_date).order_by(Workout.workout_date),
+        execution_options={'yield_per': 500}
+    )
     
     # Format data for charts
-    daily_data = {}
-    for record in workout_data:
-        date_str = record.workout_date.isoformat()
-        if date_str not in daily_data:
-            daily_data[date_str] = {
-                'date': date_str,
-                'categories': {},
-                'total_duration': 0,
-                'total_calories': 0
-            }
-        
-        daily_data[date_str]['categories'][record.category] = {
-            'duration': record.total_duration or 0,
-            'calories': round(record.total_calories, 2) if record.total_calories else 0
+    chart_data = [
+        {
+            'date': record.workout_date,
+            'categories': {
+                category: {
+                    'duration': record._mapping[f'{category}_duration'] or 0,
+                    'calories': round(record._mapping[f'{category}_calories'] or 0, 2)
+                }
+                for category in Config.WORKOUT_CATEGORIES
+            },
+            'total_duration': record.total_duration or 0,
+            'total_calories': round(record.total_calories or 0, 2)
         }
-        daily_data[date_str]['total_duration'] += record.total_duration or 0
-        daily_data[date_str]['total_calories'] += record.total_calories or 0
-    
-    # Convert to list and sort by date
-    chart_data = sorted(daily_data.values(), key=lambda x: x['date'])
+        for record in workout_data
+    ]
     
     return jsonify({
         'success': True,
@@ -133,28 +144,36 @@ def category_breakdown():
 def weekly_summary():
     """API endpoint for weekly summary"""
     # Get last 7 days
-    end_date = datetime.utcnow().date()
+    end_date = g.today
     start_date = end_date - timedelta(days=7)
     
-    workouts = Workout.query.filter(
+    category_stats = db.session.query(
+        Workout.category,
+        func.count(Workout.id).label('count'),
+        func.sum(Workout.duration).label('total_duration'),
+        func.sum(Workout.calories_burned).label('total_calories')
+    ).filter(
         Workout.user_id == current_user.id,
         Workout.workout_date >= start_date,
         Workout.workout_date <= end_date
-    ).all()
-    
-    total_duration = sum(w.duration for w in workouts)
-    total_calories = sum(w.calories_burned for w in workouts if w.calories_burned)
-    workout_count = len(workouts)
+    ).group_by(Workout.category).all()
     
     # Category breakdown
-    category_breakdown = {}
-    for category in Config.WORKOUT_CATEGORIES:
-        cat_workouts = [w for w in workouts if w.category == category]
-        category_breakdown[category] = {
-            'count': len(cat_workouts),
-            'duration': sum(w.duration for w in cat_workouts),
-            'calories': sum(w.calories_burned for w in cat_workouts if w.calories_burned)
-        }
+    category_breakdown = {
+        category: {'count': 0, 'duration': 0, 'calories': 0}
+        for category in Config.WORKOUT_CATEGORIES
+    }
+    for stat in category_stats:
+        if stat.category in category_breakdown:
+            category_breakdown[stat.category] = {
+                'count': stat.count,
+                'duration': stat.total_duration or 0,
+                'calories': round(stat.total_calories or 0, 2)
+            }
+    
+    workout_count = sum(stat.count for stat in category_stats)
+    total_duration = sum(stat.total_duration or 0 for stat in category_stats)
+    total_calories = sum(stat.total_calories or 0 for stat in category_stats)
     
     return jsonify({
         'success': True,
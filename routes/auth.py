@@ -3,10 +3,9 @@ Authentication routes blueprint
 Handles user registration, login, and logout
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
-from urllib.parse import urlparse
-from app import db
+from app import db, static_url
 from models.user import User
 
 auth_bp = Blueprint('auth', __name__)
@@ -16,7 +15,7 @@ auth_bp = Blueprint('auth', __name__)
 def register():
     """User registration"""
     if current_user.is_authenticated:
-        return redirect(url_for('main.dashboard'))
+        return redirect(static_url('main.dashboard'))
     
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
@@ -26,7 +25,7 @@ def register():
         confirm_password = request.form.get('confirm_password', '') or request.form.get('password2', '')
         
         # Validation
-        if not all([username, email, password]):
+        if not (username and email and password):
             flash('All fields are required.', 'danger')
             return render_template('auth/register.html')
         
@@ -38,12 +37,16 @@ def register():
             flash('Password must be at least 6 characters long.', 'danger')
             return render_template('auth/register.html')
         
-        # Check if user already exists
-        if User.query.filter_by(username=username).first():
+        # Check if user already exists (one query, at most two matching rows)
+        existing = db.session.query(User.username, User.email).filter(
+            (User.username == username) | (User.email == email)
+        ).all()
+        
+        if any(row.username == username for row in existing):
             flash('Username already exists. Please choose another.', 'danger')
             return render_template('auth/register.html')
         
-        if User.query.filter_by(email=email).first():
+        if existing:
             flash('Email already registered. Please login or use another email.', 'danger')
             return render_template('auth/register.html')
         
@@ -55,7 +58,7 @@ def register():
             db.session.add(user)
             db.session.commit()
             flash('Registration successful! Please login.', 'success')
-            return redirect(url_for('auth.login'))
+            return redirect(static_url('auth.login'))
         except Exception as e:
             db.session.rollback()
             flash('An error occurred during registration. Please try again.', 'danger')
@@ -68,7 +71,7 @@ def register():
 def login():
     """User login"""
     if current_user.is_authenticated:
-        return redirect(url_for('main.dashboard'))
+        return redirect(static_url('main.dashboard'))
     
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
@@ -79,16 +82,25 @@ def login():
             flash('Please provide both username and password.', 'danger')
             return render_template('auth/login.html')
         
-        # Find user by username or email
-        user = User.query.filter(
-            (User.username == username) | (User.email == username)
-        ).first()
+        # Find user by username, then by email (each a unique index lookup)
+        user = User.query.filter_by(username=username).first() or \
+            User.query.filter_by(email=username).first()
         
         if user and user.check_password(password):
+            if user.password_needs_rehash():
+                # Upgrade legacy hashes transparently on successful login
+                user.set_password(password)
+                try:
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
             login_user(user, remember=remember)
             next_page = request.args.get('next')
-            if not next_page or urlparse(next_page).netloc != '':
-                next_page = url_for('main.dashboard')
+            # Only follow same-site paths; a leading '//' or '/\' points off-site,
+            # and browsers drop tabs and newlines, so '/\t/host' would become '//host'
+            if (not next_page or not next_page.isprintable()
+                    or not next_page.startswith('/') or next_page.startswith(('//', '/\\'))):
+                next_page = static_url('main.dashboard')
             flash(f'Welcome back, {user.username}!', 'success')
             return redirect(next_page)
         else:
@@ -103,7 +115,7 @@ def logout():
     """User logout"""
     logout_user()
     flash('You have been logged out successfully.', 'info')
-    return redirect(url_for('main.index'))
+    return redirect(static_url('main.index'))
 
 
 @auth_bp.route('/profile', methods=['GET', 'POST'])
@@ -112,23 +124,24 @@ def profile():
     """User profile management"""
     if request.method == 'POST':
         # Update profile information
-        current_user.full_name = request.form.get('full_name', '').strip()
-        current_user.registration_id = request.form.get('registration_id', '').strip()
+        form = request.form
+        current_user.full_name = form.get('full_name', '').strip()
+        current_user.registration_id = form.get('registration_id', '').strip()
         
         try:
-            current_user.age = int(request.form.get('age', 0))
+            current_user.age = int(form.get('age', 0))
         except ValueError:
             current_user.age = None
         
-        current_user.gender = request.form.get('gender', '').strip().upper()
+        current_user.gender = form.get('gender', '').strip().upper()
         
         try:
-            current_user.height_cm = float(request.form.get('height_cm', 0))
+            current_user.height_cm = float(form.get('height_cm', 0))
         except ValueError:
             current_user.height_cm = None
         
         try:
-            current_user.weight_kg = float(request.form.get('weight_kg', 0))
+            current_user.weight_kg = float(form.get('weight_kg', 0))
         except ValueError:
             current_user.weight_kg = None
         
@@ -139,6 +152,6 @@ def profile():
             db.session.rollback()
             flash('An error occurred while updating profile.', 'danger')
         
-        return redirect(url_for('auth.profile'))
+        return redirect(static_url('auth.profile'))
     
     return render_template('auth/profile.html', user=current_user)
@@ -3,8 +3,9 @@ Main routes blueprint
 Handles landing page, dashboard, and general pages
 """
 
-from flask import Blueprint, render_template, redirect, url_for, jsonify
+from flask import Blueprint, render_template, redirect, jsonify
 from flask_login import login_required, current_user
+from app import static_url
 from models.workout import Workout
 
 main_bp = Blueprint('main', __name__)
@@ -23,7 +24,7 @@ def health():
 def index():
     """Landing page"""
     if current_user.is_authenticated:
-        return redirect(url_for('main.dashboard'))
+        return redirect(static_url('main.dashboard'))
     return render_template('main/index.html')
 
 
@@ -35,7 +36,7 @@ def dashboard():
     stats = current_user.get_workout_stats()
     
     # Get recent workouts (last 5)
-    recent_workouts = current_user.workouts.order_by(
+    recent_workouts = Workout.query.filter_by(user_id=current_user.id).order_by(
         Workout.workout_date.desc(), Workout.created_at.desc()
     ).limit(5).all()
     
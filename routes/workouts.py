@@ -3,15 +3,28 @@ Workout routes blueprint
 Handles workout logging, viewing, and management
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, g, abort
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
-from app import db
+from sqlalchemy import func
+from app import db, static_url
 from models.workout import Workout
+from models.user import invalidate_workout_stats
 from config import Config
 
 workouts_bp = Blueprint('workouts', __name__)
 
+# Valid workout categories for constant-time membership checks
+_CATEGORY_SET = frozenset(Config.WORKOUT_CATEGORIES)
+
+
+def _get_own_workout_or_404(workout_id):
+    """Load a workout owned by the current user, or abort with 404"""
+    return Workout.query.filter_by(
+        id=workout_id,
+        user_id=current_user.id
+    ).first_or_404()
+
 
 @workouts_bp.route('/')
 @login_required
@@ -20,22 +33,38 @@ def list_workouts():
     page = request.args.get('page', 1, type=int)
     category = request.args.get('category', None)
     
-    # Base query
-    query = current_user.workouts.order_by(
+    # Base query; the window count carries the total alongside each row
+    query = Workout.query.add_columns(func.count().over()).filter_by(
+        user_id=current_user.id
+    ).order_by(
         Workout.workout_date.desc(),
         Workout.created_at.desc()
     )
     
     # Filter by category if specified
-    if category and category in Config.WORKOUT_CATEGORIES:
-        query = query.filter_by(category=category)
+    if category and category in _CATEGORY_SET:
+        query = query.filter(Workout.category == category)
     
-    # Paginate results
+    # Paginate results without a separate COUNT query
     pagination = query.paginate(
         page=page,
         per_page=Config.WORKOUTS_PER_PAGE,
-        error_out=False
+        error_out=False,
+        count=False
     )
+    if pagination.items:
+        pagination.total = pagination.items[0][1]
+    elif page > 1:
+        # Past the last page no row carries the total; count separately and
+        # send the user to the last page that has workouts
+        pagination.total = query.with_entities(func.count(Workout.id)).order_by(None).scalar()
+        if pagination.total:
+            return redirect(url_for(
+                'workouts.list_workouts', page=pagination.pages, category=category
+            ))
+    else:
+        pagination.total = 0
+    pagination.items = [workout for workout, _ in pagination.items]
     
     workouts = pagination.items
     
@@ -43,8 +72,7 @@ def list_workouts():
         'workouts/list.html',
         workouts=workouts,
         pagination=pagination,
-        selected_category=category,
-        categories=Config.WORKOUT_CATEGORIES
+        selected_category=category
     )
 
 
@@ -53,21 +81,22 @@ def list_workouts():
 def add_workout():
     """Add a new workout"""
     if request.method == 'POST':
-        category = request.form.get('category', '').strip()
-        exercise_name = request.form.get('exercise_name', '').strip()
-        duration_str = request.form.get('duration', '0')
-        notes = request.form.get('notes', '').strip()
-        intensity = request.form.get('intensity', '').strip()
-        workout_date_str = request.form.get('workout_date', '')
+        form = request.form
+        category = form.get('category', '').strip()
+        exercise_name = form.get('exercise_name', '').strip()
+        duration_str = form.get('duration', '0')
+        notes = form.get('notes', '').strip()
+        intensity = form.get('intensity', '').strip()
+        workout_date_str = form.get('workout_date', '')
         
         # Validation
-        if not all([category, exercise_name, duration_str]):
+        if not (category and exercise_name and duration_str):
             flash('Category, exercise name, and duration are required.', 'danger')
-            return render_template('workouts/add.html', categories=Config.WORKOUT_CATEGORIES)
+            return render_template('workouts/add.html')
         
-        if category not in Config.WORKOUT_CATEGORIES:
+        if category not in _CATEGORY_SET:
             flash('Invalid workout category.', 'danger')
-            return render_template('workouts/add.html', categories=Config.WORKOUT_CATEGORIES)
+            return render_template('workouts/add.html')
         
         try:
             duration = int(duration_str)
@@ -75,16 +104,16 @@ def add_workout():
                 raise ValueError
         except ValueError:
             flash('Duration must be a positive number.', 'danger')
-            return render_template('workouts/add.html', categories=Config.WORKOUT_CATEGORIES)
+            return render_template('workouts/add.html')
         
         # Parse workout date
         if workout_date_str:
             try:
                 workout_date = datetime.strptime(workout_date_str, '%Y-%m-%d').date()
             except ValueError:
-                workout_date = datetime.utcnow().date()
+                workout_date = g.today
         else:
-            workout_date = datetime.utcnow().date()
+            workout_date = g.today
         
         # Create workout
         workout = Workout(
@@ -105,23 +134,21 @@ def add_workout():
         try:
             db.session.add(workout)
             db.session.commit()
+            invalidate_workout_stats(current_user.id)
             flash(f'Workout "{exercise_name}" added successfully!', 'success')
-            return redirect(url_for('workouts.list_workouts'))
+            return redirect(static_url('workouts.list_workouts'))
         except Exception as e:
             db.session.rollback()
             flash('An error occurred while adding the workout.', 'danger')
     
-    return render_template('workouts/add.html', categories=Config.WORKOUT_CATEGORIES)
+    return render_template('workouts/add.html')
 
 
 @workouts_bp.route('/<int:workout_id>')
 @login_required
 def view_workout(workout_id):
     """View a specific workout"""
-    workout = Workout.query.filter_by(
-        id=workout_id,
-        user_id=current_user.id
-    ).first_or_404()
+    workout = _get_own_workout_or_404(workout_id)
     
     return render_template('workouts/view.html', workout=workout)
 
@@ -130,23 +157,19 @@ def view_workout(workout_id):
 @login_required
 def edit_workout(workout_id):
     """Edit a workout"""
-    workout = Workout.query.filter_by(
-        id=workout_id,
-        user_id=current_user.id
-    ).first_or_404()
-    
     if request.method == 'POST':
-        category = request.form.get('category', '').strip()
-        exercise_name = request.form.get('exercise_name', '').strip()
-        duration_str = request.form.get('duration', '0')
-        notes = request.form.get('notes', '').strip()
-        intensity = request.form.get('intensity', '').strip()
-        workout_date_str = request.form.get('workout_date', '')
+        form = request.form
+        category = form.get('category', '').strip()
+        exercise_name = form.get('exercise_name', '').strip()
+        duration_str = form.get('duration', '0')
+        notes = form.get('notes', '').strip()
+        intensity = form.get('intensity', '').strip()
+        workout_date_str = form.get('workout_date', '')
         
         # Validation
-        if not all([category, exercise_name, duration_str]):
+        if not (category and exercise_name and duration_str):
             flash('Category, exercise name, and duration are required.', 'danger')
-            return render_template('workouts/edit.html', workout=workout, categories=Config.WORKOUT_CATEGORIES)
+            return render_template('workouts/edit.html', workout=_get_own_workout_or_404(workout_id))
         
         try:
             duration = int(duration_str)
@@ -154,55 +177,71 @@ def edit_workout(workout_id):
                 raise ValueError
         except ValueError:
             flash('Duration must be a positive number.', 'danger')
-            return render_template('workouts/edit.html', workout=workout, categories=Config.WORKOUT_CATEGORIES)
+            return render_template('workouts/edit.html', workout=_get_own_workout_or_404(workout_id))
+        
+        # Recalculate calories
+        met_value = Config.MET_VALUES.get(category, 5.0)
+        weight = current_user.weight_kg if current_user.weight_kg else 70.0
         
-        # Update workout
-        workout.category = category
-        workout.exercise_name = exercise_name
-        workout.duration = duration
-        workout.notes = notes if notes else None
-        workout.intensity = intensity if intensity else None
+        values = {
+            'category': category,
+            'exercise_name': exercise_name,
+            'duration': duration,
+            'notes': notes if notes else None,
+            'intensity': intensity if intensity else None,
+            'calories_burned': Workout.calories_for(duration, weight, met_value),
+        }
         
         if workout_date_str:
             try:
-                workout.workout_date = datetime.strptime(workout_date_str, '%Y-%m-%d').date()
+                values['workout_date'] = datetime.strptime(workout_date_str, '%Y-%m-%d').date()
             except ValueError:
                 pass
         
-        # Recalculate calories
-        met_value = Config.MET_VALUES.get(category, 5.0)
-        weight = current_user.weight_kg if current_user.weight_kg else 70.0
-        workout.calculate_calories(weight, met_value)
-        
+        # Update the row only if it belongs to the current user, in one statement
         try:
+            updated = Workout.query.filter_by(
+                id=workout_id,
+                user_id=current_user.id
+            ).update(values, synchronize_session=False)
             db.session.commit()
-            flash('Workout updated successfully!', 'success')
-            return redirect(url_for('workouts.view_workout', workout_id=workout.id))
         except Exception as e:
             db.session.rollback()
             flash('An error occurred while updating the workout.', 'danger')
+            return render_template('workouts/edit.html', workout=_get_own_workout_or_404(workout_id))
+        
+        if not updated:
+            abort(404)
+        
+        invalidate_workout_stats(current_user.id)
+        flash('Workout updated successfully!', 'success')
+        return redirect(url_for('workouts.view_workout', workout_id=workout_id))
     
-    return render_template('workouts/edit.html', workout=workout, categories=Config.WORKOUT_CATEGORIES)
+    return render_template('workouts/edit.html', workout=_get_own_workout_or_404(workout_id))
 
 
 @workouts_bp.route('/<int:workout_id>/delete', methods=['POST'])
 @login_required
 def delete_workout(workout_id):
     """Delete a workout"""
-    workout = Workout.query.filter_by(
-        id=workout_id,
-        user_id=current_user.id
-    ).first_or_404()
-    
+    # Delete the row only if it belongs to the current user, in one statement
     try:
-        db.session.delete(workout)
+        deleted = Workout.query.filter_by(
+            id=workout_id,
+            user_id=current_user.id
+        ).delete(synchronize_session=False)
         db.session.commit()
-        flash('Workout deleted successfully.', 'success')
     except Exception as e:
         db.session.rollback()
         flash('An error occurred while deleting the workout.', 'danger')
+        return redirect(static_url('workouts.list_workouts'))
+    
+    if not deleted:
+        abort(404)
     
-    return redirect(url_for('workouts.list_workouts'))
+    invalidate_workout_stats(current_user.id)
+    flash('Workout deleted successfully.', 'success')
+    return redirect(static_url('workouts.list_workouts'))
 
 
 @workouts_bp.route('/plan')
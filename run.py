@@ -5,9 +5,10 @@ Provides different modes for running the application
 """
 
 import os
+import sys
 
 from app import create_app, db
-from config import Config
+from config import Config, config
 
 # Create application instance for Gunicorn
 app = create_app(Config)
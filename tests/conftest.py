@@ -1,104 +1,213 @@
 """
 Pytest configuration and fixtures for ACEest Fitness application tests.
 """
+import itertools
 import pytest
+from contextlib import contextmanager
 import sys
 import os
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db
+from config import TestingConfig
 from models.user import User
 from models.workout import Workout
 from datetime import datetime, timezone
 
+# Lets fixture tests run test modules in a fresh pytest process
+pytest_plugins = ['pytester']
+
 
 @pytest.fixture(scope='session')
 def app():
     """Create application instance for testing."""
-    app = create_app()
-    app.config.update({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',  # In-memory DB for tests
-        'WTF_CSRF_ENABLED': False,  # Disable CSRF for testing
-        'SECRET_KEY': 'test-secret-key'
-    })
+    app = create_app(TestingConfig)
     
     with app.app_context():
+        _enable_sqlite_savepoints(db.engine)
         db.create_all()
         yield app
         db.session.remove()
         db.drop_all()
 
 
-@pytest.fixture(scope='function')
+def _enable_sqlite_savepoints(engine):
+    """Let SQLAlchemy manage SQLite transactions so SAVEPOINTs work."""
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, 'begin')
+    def _emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+    
+    # Drop connections opened by create_app before the listeners existed
+    engine.dispose()
+
+
+@pytest.fixture(scope='function', autouse=True)
+def db_session(app, seeded_users):
+    """
+    Run each test inside an outer transaction that is rolled back afterwards.
+    
+    Commits made by application code only release a SAVEPOINT, so every test
+    starts from the data seeded once per session. Depending on seeded_users
+    guarantees the seed is committed before the first outer transaction opens,
+    even when a test requests it lazily via getfixturevalue.
+    """
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    original_session = db.session
+    db.session = scoped_session(
+        sessionmaker(bind=connection, join_transaction_mode='create_savepoint'),
+        scopefunc=original_session.registry.scopefunc
+    )
+    
+    # A fresh app context per test keeps g (and the logged-in user) isolated
+    with app.app_context():
+        yield db.session
+    
+    db.session.remove()
+    transaction.rollback()
+    connection.close()
+    db.session = original_session
+
+
+@pytest.fixture(scope='session')
 def client(app):
-    """Create test client."""
+    """Create one test client for the whole session."""
     return app.test_client()
 
 
-@pytest.fixture(scope='function')
-def init_database(app):
-    """Initialize database with test data."""
+@pytest.fixture(scope='function', autouse=True)
+def _reset_client_cookies(request, app):
+    """Log the shared client out after each test that used it by dropping its auth cookies."""
+    yield
+    # Model and utility tests never touch the client, so don't build or reset it for them
+    if 'client' not in request.fixturenames:
+        return
+    
+    client = request.getfixturevalue('client')
+    client.delete_cookie(app.config['SESSION_COOKIE_NAME'])
+    client.delete_cookie(app.config.get('REMEMBER_COOKIE_NAME', 'remember_token'))
+
+
+# Canonical users seeded once per session, keyed by username
+SEED_USERS = {
+    'testuser': {'email': 'test@example.com', 'password': 'TestPassword123'},
+    'anotheruser': {'email': 'another@example.com', 'password': 'AnotherPass123'},
+}
+
+
+@pytest.fixture(scope='session')
+def seeded_users(app):
+    """Seed users and data once per session; returns credentials and ids by username."""
     with app.app_context():
-        # Clean up any existing data first
-        db.session.query(Workout).delete()
-        db.session.query(User).delete()
-        db.session.commit()
-        
-        # Create test user
-        test_user = User(
-            username='testuser',
-            email='test@example.com'
-        )
-        test_user.set_password('TestPassword123')
-        db.session.add(test_user)
-        
-        # Create another user for testing
-        another_user = User(
-            username='anotheruser',
-            email='another@example.com'
-        )
-        another_user.set_password('AnotherPass123')
-        db.session.add(another_user)
+        users = {}
+        for username, credentials in SEED_USERS.items():
+            user = User(username=username, email=credentials['email'])
+            user.set_password(credentials['password'])
+            db.session.add(user)
+            users[username] = user
         
-        db.session.commit()
-        
-        # Create test workout
-        workout = Workout(
-            user_id=test_user.id,
-            category='Workout',
-            exercise_name='Running',
-            duration=30,
-            calories_burned=300,
-            notes='Morning run',
-            workout_date=datetime.now(timezone.utc).date()
-        )
-        db.session.add(workout)
-        db.session.commit()
+        # Flush for the user ids; everything is committed once below
+        db.session.flush()
         
-        yield
-        
-        # Cleanup
-        db.session.query(Workout).delete()
-        db.session.query(User).delete()
+        # Create test workouts in a single executemany INSERT
+        db.session.bulk_save_objects([
+            Workout(
+                user_id=users['testuser'].id,
+                category='Workout',
+                exercise_name='Running',
+                duration=30,
+                calories_burned=300,
+                notes='Morning run',
+                workout_date=datetime.now(timezone.utc).date()
+            ),
+        ])
         db.session.commit()
+        seeded = {
+            username: dict(SEED_USERS[username], id=user.id)
+            for username, user in users.items()
+        }
+        db.session.remove()
+    
+    return seeded
+
+
+@pytest.fixture(scope='session')
+def user_factory(app):
+    """
+    Return a function that inserts a throwaway user and returns its id.
+    
+    Rows go through the current test's session, so the per-test rollback
+    removes them; tests that never call it insert nothing.
+    """
+    sequence = itertools.count(1)
+    
+    def make(**fields):
+        number = next(sequence)
+        user = User(**{
+            'username': f'factoryuser{number}',
+            'email': f'factoryuser{number}@example.com',
+            **fields
+        })
+        user.set_password('FactoryPass123')
+        db.session.add(user)
+        db.session.flush()
+        return user.id
+    
+    return make
+
+
+@pytest.fixture(scope='session')
+def init_database(seeded_users):
+    """Ensure the seed data exists for tests that only read it."""
+    return seeded_users
 
 
 @pytest.fixture(scope='function')
-def logged_in_client(client, init_database, app):
-    """Create authenticated test client."""
-    with app.app_context():
-        client.post('/auth/login', data={
-            'username': 'testuser',
-            'password': 'TestPassword123'
-        }, follow_redirects=True)
+def logged_in_client(client, seeded_users):
+    """Create authenticated test client by writing Flask-Login's session keys directly."""
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(seeded_users['testuser']['id'])
+        sess['_fresh'] = True
     return client
 
 
 @pytest.fixture(scope='function')
-def test_user(app, init_database):
-    """Get test user from database."""
-    with app.app_context():
-        return User.query.filter_by(username='testuser').first()
+def test_user(seeded_users):
+    """Get test user by primary key from the per-test session."""
+    return db.session.get(User, seeded_users['testuser']['id'])
+
+
+@pytest.fixture(scope='function')
+def select_statements(app):
+    """
+    Return a context manager that records the SELECT statements run inside it.
+    
+    Usage: ``with select_statements() as statements: client.get(...)``
+    """
+    @contextmanager
+    def record():
+        statements = []
+        
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+        
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statement)
+    
+    return record
@@ -2,7 +2,16 @@
 API endpoint tests.
 """
 import pytest
-import json
+import re
+from datetime import datetime, timezone
+from app import create_app, db
+from config import TestingConfig
+from models.workout import Workout
+
+# Page markers searched in one pass, without lowercasing the whole body
+HOME_PAGE = re.compile(rb'fitness', re.IGNORECASE)
+DASHBOARD_PAGE = re.compile(rb'Dashboard|(?i:workout)')
+ANALYTICS_PAGE = re.compile(rb'Analytics|(?i:statistics)')
 
 
 class TestAPIEndpoints:
@@ -12,14 +21,41 @@ class TestAPIEndpoints:
         """Test health check endpoint."""
         response = client.get('/health')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.json
         assert data['status'] == 'healthy'
+        assert data['service'] == 'ACEest Fitness'
+        assert response.data.endswith(b'\n')
+    
+    def test_json_naive_datetimes_are_utc(self, app):
+        """Test naive timestamps serialize with a UTC offset."""
+        payload = {'created_at': datetime(2024, 1, 2, 3, 4, 5)}
+        assert app.json.dumps(payload) == '{"created_at":"2024-01-02T03:04:05+00:00"}'
+    
+    def test_template_cache_size_from_config(self):
+        """Test TEMPLATE_CACHE_SIZE sets the compiled template cache capacity."""
+        class SmallCacheConfig(TestingConfig):
+            TEMPLATE_CACHE_SIZE = 5
+        
+        small_cache_app = create_app(SmallCacheConfig)
+        
+        assert small_cache_app.jinja_env.cache.capacity == 5
+    
+    def test_templates_preloaded_into_bytecode_cache(self, tmp_path):
+        """Test preloading compiles every template into the bytecode cache."""
+        class PreloadConfig(TestingConfig):
+            PRELOAD_TEMPLATES = True
+            TEMPLATE_BYTECODE_CACHE_DIR = str(tmp_path / 'jinja')
+        
+        preloaded_app = create_app(PreloadConfig)
+        
+        templates = preloaded_app.jinja_env.list_templates(extensions=['html'])
+        assert len(list((tmp_path / 'jinja').iterdir())) == len(templates)
     
     def test_home_page_loads(self, client):
         """Test home page loads successfully."""
         response = client.get('/')
         assert response.status_code == 200
-        assert b'ACEest Fitness' in response.data or b'fitness' in response.data.lower()
+        assert HOME_PAGE.search(response.data)
     
     def test_dashboard_requires_authentication(self, client):
         """Test dashboard requires login."""
@@ -30,7 +66,16 @@ class TestAPIEndpoints:
         """Test authenticated user can access dashboard."""
         response = logged_in_client.get('/dashboard')
         assert response.status_code == 200
-        assert b'Dashboard' in response.data or b'workout' in response.data.lower()
+        assert DASHBOARD_PAGE.search(response.data)
+    
+    def test_dashboard_query_count(self, logged_in_client, select_statements):
+        """Test dashboard renders without per-workout lazy loads."""
+        with select_statements() as statements:
+            response = logged_in_client.get('/dashboard')
+        
+        assert response.status_code == 200
+        # User loader, workout stats and recent workouts
+        assert len(statements) <= 3
     
     def test_analytics_page_requires_authentication(self, client):
         """Test analytics requires login."""
@@ -41,7 +86,49 @@ class TestAPIEndpoints:
         """Test authenticated user can access analytics."""
         response = logged_in_client.get('/analytics/')
         assert response.status_code == 200
-        assert b'Analytics' in response.data or b'statistics' in response.data.lower()
+        assert ANALYTICS_PAGE.search(response.data)
+    
+    @staticmethod
+    def _add_unrounded_workout(user):
+        """Add today's workout with calories computed for a 71.3 kg user (336.8925)."""
+        workout = Workout(
+            user_id=user.id,
+            category='Workout',
+            exercise_name='Cycling',
+            duration=45,
+            workout_date=datetime.now(timezone.utc).date()
+        )
+        workout.calculate_calories(71.3, 6.0)
+        db.session.add(workout)
+        db.session.commit()
+    
+    def test_chart_data(self, logged_in_client, test_user):
+        """Test chart data returns one row per date with every category."""
+        self._add_unrounded_workout(test_user)
+        
+        response = logged_in_client.get('/analytics/api/chart-data')
+        assert response.status_code == 200
+        data = response.json['data']
+        assert len(data) == 1
+        assert data[0]['date'] == datetime.now(timezone.utc).date().isoformat()
+        assert data[0]['total_duration'] == 75
+        assert data[0]['total_calories'] == 636.89
+        assert data[0]['categories']['Workout'] == {'duration': 75, 'calories': 636.89}
+        assert data[0]['categories']['Cool-down'] == {'duration': 0, 'calories': 0}
+    
+    def test_weekly_summary(self, logged_in_client, test_user):
+        """Test weekly summary aggregates workouts by category."""
+        self._add_unrounded_workout(test_user)
+        
+        response = logged_in_client.get('/analytics/api/weekly-summary')
+        assert response.status_code == 200
+        summary = response.json['summary']
+        assert summary['total_workouts'] == 2
+        assert summary['total_duration'] == 75
+        assert summary['total_calories'] == 636.89
+        assert summary['categories']['Workout']['count'] == 2
+        assert summary['categories']['Workout']['calories'] == 636.89
+        assert summary['categories']['Warm-up']['count'] == 0
     
     def test_404_error_page(self, client):
         """Test 404 error handling."""
@@ -2,8 +2,14 @@
 Authentication route tests.
 """
 import pytest
+import re
 from models.user import User
 
+# Error markers searched in one pass, without lowercasing the whole body
+ALREADY_TAKEN = re.compile(rb'already', re.IGNORECASE)
+PASSWORD_MISMATCH = re.compile(rb'match', re.IGNORECASE)
+INVALID_LOGIN = re.compile(rb'invalid', re.IGNORECASE)
+
 
 class TestAuthentication:
     """Test authentication functionality."""
@@ -20,7 +26,7 @@ class TestAuthentication:
         assert response.status_code == 200
         assert b'Login' in response.data
     
-    def test_successful_registration(self, client, app):
+    def test_successful_registration(self, client):
         """Test user can register successfully."""
         response = client.post('/auth/register', data={
             'username': 'newuser',
@@ -32,10 +38,9 @@ class TestAuthentication:
         assert response.status_code == 200
         
         # Verify user created in database
-        with app.app_context():
-            user = User.query.filter_by(username='newuser').first()
-            assert user is not None
-            assert user.email == 'newuser@example.com'
+        user = User.query.filter_by(username='newuser').first()
+        assert user is not None
+        assert user.email == 'newuser@example.com'
     
     def test_registration_duplicate_username(self, client, init_database):
         """Test registration fails with duplicate username."""
@@ -47,7 +52,19 @@ class TestAuthentication:
         }, follow_redirects=True)
         
         assert response.status_code == 200
-        assert b'Username already exists' in response.data or b'already' in response.data.lower()
+        assert ALREADY_TAKEN.search(response.data)
+    
+    def test_registration_duplicate_email(self, client, seeded_users):
+        """Test registration fails with duplicate email."""
+        response = client.post('/auth/register', data={
+            'username': 'differentuser',
+            'email': seeded_users['testuser']['email'],  # Already registered
+            'password': 'Password123',
+            'password2': 'Password123'
+        }, follow_redirects=True)
+        
+        assert response.status_code == 200
+        assert b'Email already registered' in response.data
     
     def test_registration_password_mismatch(self, client):
         """Test registration fails when passwords don't match."""
@@ -59,18 +76,46 @@ class TestAuthentication:
         }, follow_redirects=True)
         
         assert response.status_code == 200
-        assert b'Passwords must match' in response.data or b'match' in response.data.lower()
+        assert PASSWORD_MISMATCH.search(response.data)
     
-    def test_successful_login(self, client, init_database):
+    def test_successful_login(self, client, seeded_users):
         """Test user can login successfully."""
         response = client.post('/auth/login', data={
             'username': 'testuser',
-            'password': 'TestPassword123'
+            'password': seeded_users['testuser']['password']
         }, follow_redirects=True)
         
         assert response.status_code == 200
         assert b'Dashboard' in response.data or b'Welcome' in response.data
     
+    def test_login_with_email(self, client, seeded_users):
+        """Test user can login with their email address."""
+        response = client.post('/auth/login', data={
+            'username': seeded_users['testuser']['email'],
+            'password': seeded_users['testuser']['password']
+        }, follow_redirects=True)
+        
+        assert response.status_code == 200
+        assert b'Welcome back, testuser' in response.data
+    
+    @pytest.mark.parametrize('next_page, expected', [
+        ('/workouts/', '/workouts/'),
+        ('https://evil.example.com/', '/dashboard'),
+        ('//evil.example.com/', '/dashboard'),
+        ('/\\evil.example.com/', '/dashboard'),
+        ('/\t/evil.example.com/', '/dashboard'),
+        ('/\n/evil.example.com/', '/dashboard'),
+    ])
+    def test_login_next_redirect(self, client, seeded_users, next_page, expected):
+        """Test login only follows same-site next paths."""
+        response = client.post('/auth/login', query_string={'next': next_page}, data={
+            'username': 'testuser',
+            'password': seeded_users['testuser']['password']
+        })
+        
+        assert response.status_code == 302
+        assert response.headers['Location'] == expected
+    
     def test_login_invalid_credentials(self, client, init_database):
         """Test login fails with invalid credentials."""
         response = client.post('/auth/login', data={
@@ -79,7 +124,7 @@ class TestAuthentication:
         }, follow_redirects=True)
         
         assert response.status_code == 200
-        assert b'Invalid username or password' in response.data or b'invalid' in response.data.lower()
+        assert INVALID_LOGIN.search(response.data)
     
     def test_login_nonexistent_user(self, client):
         """Test login fails for non-existent user."""
@@ -89,7 +134,7 @@ class TestAuthentication:
         }, follow_redirects=True)
         
         assert response.status_code == 200
-        assert b'Invalid username or password' in response.data or b'invalid' in response.data.lower()
+        assert INVALID_LOGIN.search(response.data)
     
     def test_logout(self, logged_in_client):
         """Test user can logout."""
@@ -100,6 +145,26 @@ class TestAuthentication:
         response = logged_in_client.get('/dashboard')
         assert response.status_code == 302  # Redirect to login
     
+    def test_profile_update(self, logged_in_client):
+        """Test user can update and view their profile."""
+        response = logged_in_client.post('/auth/profile', data={
+            'full_name': 'Test Person',
+            'registration_id': 'REG-001',
+            'age': '30',
+            'gender': 'm',
+            'height_cm': '180',
+            'weight_kg': '81'
+        }, follow_redirects=True)
+        
+        assert response.status_code == 200
+        assert b'REG-001' in response.data
+        assert b'25.0' in response.data  # BMI
+        
+        user = User.query.filter_by(username='testuser').first()
+        assert user.full_name == 'Test Person'
+        assert user.gender == 'M'
+        assert user.weight_kg == 81
+    
     def test_protected_route_requires_login(self, client):
         """Test protected routes redirect to login."""
         response = client.get('/dashboard')
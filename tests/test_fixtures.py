@@ -0,0 +1,20 @@
+"""
+Fixture isolation tests.
+"""
+import os
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('module', ['test_workouts.py', 'test_auth.py'])
+def test_module_passes_on_its_own(pytester, module):
+    """Test modules that use lazily requested seed data pass when run alone."""
+    result = pytester.runpytest_subprocess(
+        os.path.join(TESTS_DIR, module),
+        '-p', 'no:cacheprovider', '--no-cov', '-q'
+    )
+    outcomes = result.parseoutcomes()
+    assert result.ret == 0, result.stdout.str()
+    assert outcomes['passed'] > 0
@@ -2,119 +2,215 @@
 Model tests for User and Workout models.
 """
 import pytest
+import time_machine
+from sqlalchemy import select, text
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.security import generate_password_hash
+from app import db
 from models.user import User
 from models.workout import Workout
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
 
 class TestUserModel:
     """Test User model functionality."""
     
-    def test_user_creation(self, app):
+    def test_user_creation(self):
         """Test creating a user."""
-        with app.app_context():
-            user = User(username='modeltest', email='modeltest@example.com')
-            user.set_password('TestPass123')
-            
-            assert user.username == 'modeltest'
-            assert user.email == 'modeltest@example.com'
-            assert user.password_hash is not None
-            assert user.password_hash != 'TestPass123'
-    
-    def test_password_hashing(self, app):
+        user = User(username='modeltest', email='modeltest@example.com')
+        user.set_password('TestPass123')
+        
+        assert user.username == 'modeltest'
+        assert user.email == 'modeltest@example.com'
+        assert user.password_hash is not None
+        assert user.password_hash != 'TestPass123'
+    
+    def test_password_hashing(self):
         """Test password is properly hashed."""
-        with app.app_context():
-            user = User(username='hashtest', email='hash@example.com')
-            user.set_password('MySecretPassword')
-            
-            assert user.check_password('MySecretPassword') is True
-            assert user.check_password('WrongPassword') is False
-    
-    def test_user_repr(self, app):
+        user = User(username='hashtest', email='hash@example.com')
+        user.set_password('MySecretPassword')
+        
+        assert user.check_password('MySecretPassword') is True
+        assert user.check_password('WrongPassword') is False
+    
+    def test_legacy_password_hash(self):
+        """Test legacy Werkzeug hashes still verify and are flagged for rehash."""
+        user = User(username='legacy', email='legacy@example.com',
+                    password_hash=generate_password_hash(
+                        'OldPassword', method='pbkdf2:sha256:1000'))
+        
+        assert user.check_password('OldPassword') is True
+        assert user.check_password('WrongPassword') is False
+        assert user.password_needs_rehash() is True
+        
+        user.set_password('OldPassword')
+        assert user.password_hash.startswith('$argon2')
+        assert user.password_needs_rehash() is False
+    
+    def test_user_repr(self):
         """Test user string representation."""
-        with app.app_context():
-            user = User(username='reprtest', email='repr@example.com')
-            assert 'reprtest' in repr(user)
+        user = User(username='reprtest', email='repr@example.com')
+        assert 'reprtest' in repr(user)
+    
+    def test_health_metrics_follow_profile_updates(self):
+        """Test cached health metrics are recomputed when profile changes."""
+        user = User(username='metrics', email='metrics@example.com',
+                    height_cm=180, weight_kg=81, age=30, gender='M')
+        assert user.bmi == 25.0
+        assert user.bmi_category == 'Overweight'
+        assert user.bmr == 1790
+        
+        user.weight_kg = 72
+        assert user.bmi == 22.22
+        assert user.bmi_category == 'Normal weight'
+        assert user.bmr == 1700
+        assert user.tdee == pytest.approx(1700 * 1.55)
     
-    def test_user_relationship_with_workouts(self, app, init_database, test_user):
+    @pytest.mark.parametrize('weight_kg, expected', [
+        (15.9, 'Severely Underweight'),
+        (16, 'Underweight'),
+        (18.5, 'Normal weight'),
+        (25, 'Overweight'),
+        (30, 'Obese Class I'),
+        (35, 'Obese Class II'),
+        (40, 'Obese Class III'),
+    ])
+    def test_bmi_category_boundaries(self, weight_kg, expected):
+        """Test BMI category thresholds (1 m height makes BMI equal weight)."""
+        user = User(username='bmitest', email='bmi@example.com',
+                    height_cm=100, weight_kg=weight_kg)
+        assert user.bmi_category == expected
+    
+    def test_user_relationship_with_workouts(self, init_database, test_user):
         """Test user-workout relationship."""
-        with app.app_context():
-            user = User.query.filter_by(username='testuser').first()
-            assert user.workouts.count() > 0
-            assert isinstance(user.workouts.first(), Workout)
+        user = db.session.get(User, test_user.id, options=[selectinload(User.workouts)])
+        assert len(user.workouts) > 0
+        assert isinstance(user.workouts[0], Workout)
+    
+    def test_get_workout_stats(self, init_database, test_user):
+        """Test workout statistics are aggregated for the user."""
+        user = User.query.filter_by(username='testuser').first()
+        stats = user.get_workout_stats()
+        
+        assert stats['total_workouts'] == 1
+        assert stats['total_duration'] == 30
+        assert stats['total_calories'] == 300
+        assert stats['average_duration'] == 30.0
+    
+    def test_get_workout_stats_no_workouts(self, user_factory):
+        """Test workout statistics default to zero without workouts."""
+        user = db.session.get(User, user_factory())
+        stats = user.get_workout_stats()
+        
+        assert stats['total_workouts'] == 0
+        assert stats['total_duration'] == 0
+        assert stats['total_calories'] == 0
+        assert stats['average_duration'] == 0
 
 
 class TestWorkoutModel:
     """Test Workout model functionality."""
     
-    def test_workout_creation(self, app, test_user):
+    def test_workout_creation(self, test_user):
         """Test creating a workout."""
-        with app.app_context():
-            workout = Workout(
-                user_id=test_user.id,
-                category='Workout',
-                exercise_name='Testing',
-                duration=25,
-                calories_burned=250,
-                notes='Test workout'
-            )
-            
-            assert workout.category == 'Workout'
-            assert workout.exercise_name == 'Testing'
-            assert workout.duration == 25
-            assert workout.calories_burned == 250
-            assert workout.notes == 'Test workout'
-    
-    def test_workout_date_default(self, app, test_user):
-        """Test workout date defaults to current time."""
-        with app.app_context():
-            before = datetime.now(timezone.utc).date()
-            workout = Workout(
-                user_id=test_user.id,
-                category='Workout',
-                exercise_name='Testing',
-                duration=20,
-                calories_burned=200
-            )
-            after = datetime.now(timezone.utc).date()
-            
-            assert workout.workout_date is not None
-            assert before <= workout.workout_date <= after
-    
-    def test_workout_repr(self, app, test_user):
+        workout = Workout(
+            user_id=test_user.id,
+            category='Workout',
+            exercise_name='Testing',
+            duration=25,
+            calories_burned=250,
+            notes='Test workout'
+        )
+        
+        assert workout.category == 'Workout'
+        assert workout.exercise_name == 'Testing'
+        assert workout.duration == 25
+        assert workout.calories_burned == 250
+        assert workout.notes == 'Test workout'
+    
+    @time_machine.travel(datetime(2024, 1, 1, tzinfo=timezone.utc), tick=False)
+    def test_workout_date_default(self, test_user):
+        """Test workout date and timestamps default to current time on flush."""
+        workout = Workout(
+            user_id=test_user.id,
+            category='Workout',
+            exercise_name='Testing',
+            duration=20,
+            calories_burned=200
+        )
+        db.session.add(workout)
+        db.session.flush()
+        
+        assert workout.workout_date == date(2024, 1, 1)
+        assert workout.created_at == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert workout.updated_at == workout.created_at
+        db.session.rollback()
+    
+    def test_workout_repr(self, test_user):
         """Test workout string representation."""
-        with app.app_context():
-            workout = Workout(
-                user_id=test_user.id,
-                category='Workout',
-                exercise_name='Running',
-                duration=30,
-                calories_burned=300
-            )
-            
-            repr_str = repr(workout)
-            assert 'Running' in repr_str
-    
-    def test_workout_user_relationship(self, app, init_database):
+        workout = Workout(
+            user_id=test_user.id,
+            category='Workout',
+            exercise_name='Running',
+            duration=30,
+            calories_burned=300
+        )
+        
+        repr_str = repr(workout)
+        assert 'Running' in repr_str
+    
+    def test_workout_user_relationship(self, init_database):
         """Test workout-user relationship."""
-        with app.app_context():
-            workout = Workout.query.first()
-            assert workout.user is not None
-            assert isinstance(workout.user, User)
-            assert workout.user.username == 'testuser'
+        workout = db.session.execute(
+            select(Workout).options(joinedload(Workout.user)).limit(1)
+        ).scalar_one()
+        assert workout.user is not None
+        assert isinstance(workout.user, User)
+        assert workout.user.username == 'testuser'
     
-    def test_workout_calculation_fields(self, app, test_user):
+    def test_totals_for_user_date_range(self, init_database, test_user):
+        """Test workout totals honour the optional date range."""
+        today = datetime.now(timezone.utc).date()
+        
+        totals = Workout.totals_for_user(test_user.id, start_date=today, end_date=today)
+        assert totals.count == 1
+        assert totals.duration == 30
+        assert totals.calories == 300
+        
+        totals = Workout.totals_for_user(test_user.id, start_date=today + timedelta(days=1))
+        assert totals.count == 0
+        assert totals.duration == 0
+        assert totals.calories == 0
+    
+    def test_workout_calculation_fields(self, test_user):
         """Test workout numeric fields."""
-        with app.app_context():
-            workout = Workout(
-                user_id=test_user.id,
-                category='Workout',
-                exercise_name='Cycling',
-                duration=60,
-                calories_burned=500,
-                notes='Long ride'
-            )
-            
-            # Calculate calories per minute
-            calories_per_minute = workout.calories_burned / workout.duration
-            assert abs(calories_per_minute - 8.33) < 0.1
+        workout = Workout(
+            user_id=test_user.id,
+            category='Workout',
+            exercise_name='Cycling',
+            duration=60,
+            calories_burned=500,
+            notes='Long ride'
+        )
+        
+        # Calculate calories per minute
+        calories_per_minute = workout.calories_burned / workout.duration
+        assert abs(calories_per_minute - 8.33) < 0.1
+
+
+class TestModelsPackage:
+    """Test the models package exposes a single set of mapped classes."""
+    
+    def test_package_exports_are_canonical(self):
+        """Test package-level exports are the same classes as the submodules."""
+        import models
+        
+        assert models.User is User
+        assert models.Workout is Workout
+        assert User.__table__ is User.metadata.tables['users']
+        assert Workout.__table__ is Workout.metadata.tables['workouts']
+    
+    def test_sqlite_pragmas(self):
+        """Test SQLite connections use the configured journal and sync modes."""
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'memory'
+        assert db.session.execute(text('PRAGMA synchronous')).scalar() == 0  # OFF
@@ -0,0 +1,79 @@
+"""
+Utility function tests.
+"""
+import pytest
+import utils
+from utils import (
+    calculate_met_calories,
+    calculate_met_calories_bulk,
+    sum_met_calories,
+    format_duration,
+    get_bmi_category,
+    validate_workout_data,
+)
+
+
+class TestUtils:
+    """Test utility helpers."""
+    
+    @pytest.mark.parametrize('minutes, expected', [
+        (45, '45 min'),
+        (60, '1 hr'),
+        (95, '1 hr 35 min'),
+    ])
+    def test_format_duration(self, minutes, expected):
+        """Test duration formatting, cached and uncached."""
+        assert format_duration(minutes) == expected
+        assert format_duration(minutes) == format_duration.__wrapped__(minutes)
+    
+    @pytest.mark.parametrize('bmi, expected', [
+        (None, 'Unknown'),
+        (17.0, 'Underweight'),
+        (18.5, 'Normal weight'),
+        (27.3, 'Overweight'),
+        (30, 'Obese'),
+    ])
+    def test_get_bmi_category(self, bmi, expected):
+        """Test BMI categories, cached and uncached."""
+        assert get_bmi_category(bmi) == expected
+        assert get_bmi_category(bmi) == get_bmi_category.__wrapped__(bmi)
+    
+    def test_validate_workout_data(self):
+        """Test workout input validation."""
+        assert validate_workout_data('Workout', 'Running', '30') == (True, '')
+        assert validate_workout_data('Stretching', 'Running', '30')[0] is False
+        assert validate_workout_data('Workout', 'Running', '0')[0] is False
+        assert validate_workout_data('Workout', 'Running', 'abc')[0] is False
+    
+    @pytest.mark.parametrize('use_numpy', [True, False])
+    def test_calculate_met_calories_bulk(self, monkeypatch, use_numpy):
+        """Test bulk calories match the scalar MET formula on both code paths."""
+        if use_numpy:
+            assert utils.np is not None  # NumPy is installed from requirements-test.txt
+        else:
+            monkeypatch.setattr(utils, 'np', None)
+        
+        # 3.0 MET x 71 kg x 10 min rounded to 37.28 when the product was reordered
+        mets = [8.0, 3.0, 2.5]
+        durations = [30, 10, 45]
+        
+        bulk = calculate_met_calories_bulk(mets, 71, durations)
+        
+        assert [round(float(c), 2) for c in bulk] == [
+            calculate_met_calories(met, 71, duration)
+            for met, duration in zip(mets, durations)
+        ]
+        assert [float(c) for c in calculate_met_calories_bulk(mets, None, durations)] == [0.0] * 3
+    
+    def test_sum_met_calories(self):
+        """Test the calorie total matches summing the scalar MET formula."""
+        mets = [8.0, 3.0, 2.5]
+        durations = [30, 10, 45]
+        
+        expected = sum(
+            (met * 3.5 * 70 / 200) * duration
+            for met, duration in zip(mets, durations)
+        )
+        
+        assert sum_met_calories(mets, 70, durations) == round(expected, 2)
+        assert sum_met_calories(mets, None, durations) == 0.0
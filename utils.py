@@ -2,10 +2,26 @@
 Utility functions for ACEest Fitness application
 """
 
-from datetime import datetime, timedelta
-from functools import wraps
-from flask import flash, redirect, url_for
+from bisect import bisect_right
+from datetime import timedelta
+from math import fsum
+from functools import lru_cache, wraps
+from flask import flash, g, redirect
 from flask_login import current_user
+from app import static_url
+from config import Config
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; bulk helpers fall back to Python
+    np = None
+
+# Valid workout categories for constant-time membership checks
+_CATEGORY_SET = frozenset(Config.WORKOUT_CATEGORIES)
+
+# Upper bounds (exclusive) of each BMI category, in ascending order
+_BMI_CUTS = (18.5, 25.0, 30.0)
+_BMI_LABELS = ('Underweight', 'Normal weight', 'Overweight', 'Obese')
 
 
 def profile_complete_required(f):
@@ -13,11 +29,11 @@ def profile_complete_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
+            return redirect(static_url('auth.login'))
         
-        if not all([current_user.height_cm, current_user.weight_kg, current_user.age, current_user.gender]):
+        if not (current_user.height_cm and current_user.weight_kg and current_user.age and current_user.gender):
             flash('Please complete your profile first to access this feature.', 'warning')
-            return redirect(url_for('auth.profile'))
+            return redirect(static_url('auth.profile'))
         
         return f(*args, **kwargs)
     return decorated_function
@@ -36,15 +52,69 @@ def calculate_met_calories(met_value, weight_kg, duration_minutes):
         float: Calories burned
     """
     # Formula: Calories = (MET × 3.5 × weight_kg / 200) × duration_minutes
-    if not all([met_value, weight_kg, duration_minutes]):
+    if not (met_value and weight_kg and duration_minutes):
         return 0.0
     
     return round((met_value * 3.5 * weight_kg / 200) * duration_minutes, 2)
 
 
+def calculate_met_calories_bulk(met_values, weight_kg, durations):
+    """
+    Calculate calories burned for many activities at once using MET formula
+    
+    Args:
+        met_values: Sequence of MET values, one per activity
+        weight_kg: User's weight in kilograms
+        durations: Sequence of durations in minutes, aligned with met_values
+    
+    Returns:
+        Unrounded calories burned per activity, as stored on Workout (NumPy
+        array when NumPy is installed, otherwise a list); round(value, 2)
+        matches calculate_met_calories
+    """
+    if np is None:
+        if not weight_kg:
+            return [0.0 for _ in met_values]
+        return [(met * 3.5 * weight_kg / 200.0) * duration
+                for met, duration in zip(met_values, durations)]
+    
+    mets = np.asarray(met_values, dtype=np.float64)
+    minutes = np.asarray(durations, dtype=np.float64)
+    if not weight_kg:
+        return np.zeros_like(mets)
+    
+    # Same operation order as the scalar formula so results agree bit for bit
+    return (mets * 3.5 * weight_kg / 200.0) * minutes
+
+
+def sum_met_calories(met_values, weight_kg, durations):
+    """
+    Calculate total calories burned across many activities using MET formula
+    
+    Args:
+        met_values: Sequence of MET values, one per activity
+        weight_kg: User's weight in kilograms
+        durations: Sequence of durations in minutes, aligned with met_values
+    
+    Returns:
+        float: Total calories burned, rounded to 2 decimal places
+    """
+    if not weight_kg:
+        return 0.0
+    
+    # The weight factor is shared, so the total is a single dot product
+    if np is None:
+        total = fsum(met * duration for met, duration in zip(met_values, durations))
+    else:
+        total = float(np.dot(np.asarray(met_values, dtype=np.float64),
+                             np.asarray(durations, dtype=np.float64)))
+    
+    return round(total * 3.5 * weight_kg / 200, 2)
+
+
 def get_date_range(days=7):
     """
-    Get a date range for the last N days
+    Get a date range for the last N days (requires an active request)
     
     Args:
         days: Number of days to go back (default: 7)
@@ -52,11 +122,12 @@ def get_date_range(days=7):
     Returns:
         tuple: (start_date, end_date)
     """
-    end_date = datetime.utcnow().date()
+    end_date = g.today
     start_date = end_date - timedelta(days=days)
     return start_date, end_date
 
 
+@lru_cache(maxsize=256)
 def format_duration(minutes):
     """
     Format duration in minutes to hours and minutes
@@ -79,6 +150,7 @@ def format_duration(minutes):
     return f"{hours} hr {mins} min"
 
 
+@lru_cache(maxsize=128)
 def get_bmi_category(bmi):
     """
     Determine BMI category
@@ -92,14 +164,7 @@ def get_bmi_category(bmi):
     if not bmi:
         return "Unknown"
     
-    if bmi < 18.5:
-        return "Underweight"
-    elif 18.5 <= bmi < 25:
-        return "Normal weight"
-    elif 25 <= bmi < 30:
-        return "Overweight"
-    else:
-        return "Obese"
+    return _BMI_LABELS[bisect_right(_BMI_CUTS, bmi)]
 
 
 def validate_workout_data(category, exercise_name, duration):
@@ -114,9 +179,7 @@ def validate_workout_data(category, exercise_name, duration):
     Returns:
         tuple: (is_valid: bool, error_message: str)
     """
-    from config import Config
-    
-    if not category or category not in Config.WORKOUT_CATEGORIES:
+    if not category or category not in _CATEGORY_SET:
         return False, "Invalid workout category"
     
     if not exercise_name or len(exercise_name.strip()) == 0: